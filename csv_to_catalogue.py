@@ -1,108 +1,86 @@
+import argparse
+import base64
 import csv
+import gzip
+import hashlib
 import html
+import io
+import json
+import os
+import re
+import sys
+from contextlib import nullcontext
 from pathlib import Path
 
-def csv_to_catalogue(csv_file, output_file='catalogue.html', title='Alza Product Export List'):
-    """
-    Convert a CSV file into an interactive HTML catalogue with filtering and search.
-    
-    Args:
-        csv_file: Path to the CSV file
-        output_file: Output HTML file name (default: catalogue.html)
-        title: Title for the catalogue page
-    """
-    
-    # Read CSV data
-    items = []
-    headers = []
-    
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        headers = reader.fieldnames
-        items = list(reader)
-    
-    if not items:
-        print("Error: CSV file is empty or invalid")
-        return
-    
-    # Check if CPU and RAM columns exist
-    cpu_column = next((h for h in headers if 'cpu' in h.lower() or 'processor' in h.lower()), None)
-    ram_column = next((h for h in headers if 'ram' in h.lower() or 'memory' in h.lower() or 'paměť' in h.lower()), None)
-    
-    # Get unique values for filters
-    cpu_values = set()
-    ram_values = set()
-    
-    if cpu_column:
-        cpu_values = sorted(set(item.get(cpu_column, '') for item in items if item.get(cpu_column, '')))
-    
-    if ram_column:
-        ram_values = sorted(set(item.get(ram_column, '') for item in items if item.get(ram_column, '')))
-    
-    # Generate HTML
-    html_content = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{html.escape(title)}</title>
-    <style>
-        * {{
+from profiling import profile_run
+
+try:
+    import brotli
+except ImportError:  # Optional, only used for precompressed production builds
+    brotli = None
+
+# Bump when the row markup or row keys change so stale caches are discarded
+CACHE_VERSION = 4
+
+# Facet values in fewer than one row in this many are embedded as row lists
+DENSE_FACET_RATIO = 32
+
+CATALOGUE_CSS = '''        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
             background: #f5f7fa;
             color: #333;
             padding: 20px;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1600px;
             margin: 0 auto;
-        }}
+        }
         
-        .header {{
+        .header {
             background: white;
             padding: 30px;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.08);
             margin-bottom: 20px;
-        }}
+        }
         
-        h1 {{
+        h1 {
             font-size: 2em;
             color: #1a1a1a;
             margin-bottom: 20px;
             font-weight: 600;
-        }}
+        }
         
-        .controls {{
+        .controls {
             display: flex;
             gap: 15px;
             align-items: center;
             flex-wrap: wrap;
             margin-bottom: 20px;
-        }}
+        }
         
-        .filter-group {{
+        .filter-group {
             display: flex;
             flex-direction: column;
             gap: 5px;
-        }}
+        }
         
-        .filter-label {{
+        .filter-label {
             font-size: 0.85em;
             font-weight: 600;
             color: #64748b;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
         
-        .filter-select {{
+        .filter-select {
             padding: 10px 15px;
             border: 2px solid #e2e8f0;
             border-radius: 6px;
@@ -111,38 +89,38 @@ def csv_to_catalogue(csv_file, output_file='catalogue.html', title='Alza Product
             cursor: pointer;
             min-width: 180px;
             transition: all 0.2s ease;
-        }}
+        }
         
-        .filter-select:hover {{
+        .filter-select:hover {
             border-color: #5a67d8;
-        }}
+        }
         
-        .filter-select:focus {{
+        .filter-select:focus {
             outline: none;
             border-color: #5a67d8;
             box-shadow: 0 0 0 3px rgba(90, 103, 216, 0.1);
-        }}
+        }
         
-        .search-box {{
+        .search-box {
             flex: 1;
             min-width: 300px;
-        }}
+        }
         
-        .search-input {{
+        .search-input {
             width: 100%;
             padding: 12px 16px;
             border: 2px solid #e2e8f0;
             border-radius: 6px;
             font-size: 0.95em;
             transition: all 0.2s ease;
-        }}
+        }
         
-        .search-input:focus {{
+        .search-input:focus {
             outline: none;
             border-color: #5a67d8;
-        }}
+        }
         
-        .clear-filters {{
+        .clear-filters {
             background: #ef4444;
             color: white;
             border: none;
@@ -152,39 +130,39 @@ def csv_to_catalogue(csv_file, output_file='catalogue.html', title='Alza Product
             cursor: pointer;
             transition: all 0.2s ease;
             font-weight: 500;
-        }}
+        }
         
-        .clear-filters:hover {{
+        .clear-filters:hover {
             background: #dc2626;
-        }}
+        }
         
-        .filter-info {{
+        .filter-info {
             background: #eff6ff;
             border: 2px solid #bfdbfe;
             padding: 12px 16px;
             border-radius: 6px;
             color: #1e40af;
             font-size: 0.9em;
-        }}
+        }
         
-        .table-container {{
+        .table-container {
             background: white;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.08);
             overflow: hidden;
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
-        }}
+        }
         
-        thead {{
+        thead {
             background: #f8fafc;
             border-bottom: 2px solid #e2e8f0;
-        }}
+        }
         
-        th {{
+        th {
             padding: 16px 20px;
             text-align: left;
             font-weight: 600;
@@ -192,88 +170,88 @@ def csv_to_catalogue(csv_file, output_file='catalogue.html', title='Alza Product
             font-size: 0.85em;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
         
-        th:first-child {{
+        th:first-child {
             padding-left: 24px;
             width: 60px;
-        }}
+        }
         
-        tbody tr {{
+        tbody tr {
             border-bottom: 1px solid #f1f5f9;
             transition: background 0.15s ease;
-        }}
+        }
         
-        tbody tr:hover {{
+        tbody tr:hover {
             background: #f8fafc;
-        }}
+        }
         
-        tbody tr:nth-child(even) {{
+        tbody tr:nth-child(even) {
             background: #fafbfc;
-        }}
+        }
         
-        tbody tr:nth-child(even):hover {{
+        tbody tr:nth-child(even):hover {
             background: #f1f5f9;
-        }}
+        }
         
-        tbody tr.hidden {{
+        tbody tr.hidden {
             display: none;
-        }}
+        }
         
-        td {{
+        td {
             padding: 16px 20px;
             color: #334155;
             font-size: 0.95em;
-        }}
+        }
         
-        td:first-child {{
+        td:first-child {
             padding-left: 24px;
             color: #64748b;
             font-weight: 500;
             width: 60px;
-        }}
+        }
         
-        .detail-icon {{
+        .detail-icon {
             color: #5a67d8;
             cursor: pointer;
             font-size: 1.2em;
             transition: color 0.2s;
-        }}
+        }
         
-        .detail-icon:hover {{
+        .detail-icon:hover {
             color: #4c51bf;
-        }}
+        }
         
-        .product-name {{
+        .product-name {
             font-weight: 500;
             color: #1a202c;
-        }}
+        }
         
-        .product-price {{
+        .product-price {
             font-weight: 600;
             color: #2d3748;
-        }}
+        }
         
-        .product-link a {{
+        .product-link a {
             color: #5a67d8;
             text-decoration: none;
             transition: color 0.2s;
             word-break: break-all;
-        }}
+        }
         
-        .product-link a:hover {{
+        .product-link a:hover {
             color: #4c51bf;
             text-decoration: underline;
-        }}
+        }
         
-        .no-results {{
+        .no-results {
             text-align: center;
             padding: 60px 20px;
             color: #94a3b8;
             font-size: 1.1em;
-        }}
+        }
         
-        .footer {{
+        .footer {
             margin-top: 20px;
             padding: 16px 24px;
             background: white;
@@ -284,36 +262,641 @@ def csv_to_catalogue(csv_file, output_file='catalogue.html', title='Alza Product
             display: flex;
             justify-content: space-between;
             align-items: center;
-        }}
+        }
         
-        @media (max-width: 768px) {{
-            .table-container {{
+        @media (max-width: 768px) {
+            .table-container {
                 overflow-x: auto;
-            }}
+            }
             
-            table {{
+            table {
                 min-width: 600px;
-            }}
+            }
             
-            h1 {{
+            h1 {
                 font-size: 1.5em;
-            }}
+            }
             
-            .controls {{
+            .controls {
                 flex-direction: column;
                 align-items: stretch;
-            }}
+            }
             
-            .filter-group, .search-box {{
+            .filter-group, .search-box {
                 width: 100%;
-            }}
+            }
             
-            .filter-select {{
+            .filter-select {
                 width: 100%;
-            }}
-        }}
-    </style>
-</head>
+            }
+        }
+'''
+
+CATALOGUE_SCRIPT = '''        const searchInput = document.getElementById('searchInput');
+        const clearFiltersBtn = document.getElementById('clearFilters');
+        const tableBody = document.getElementById('tableBody');
+        const tableContainer = document.querySelector('.table-container');
+        const noResults = document.getElementById('noResults');
+        const filterInfo = document.getElementById('filterInfo');
+        const visibleCount = document.getElementById('visibleCount');
+        
+        // Rows holding each facet value: a bitset (bit i = row i) for common
+        // values, gaps between row indices for rare ones
+        const facetData = JSON.parse(document.getElementById('facetData').textContent);
+        const rows = tableBody.rows;
+        const wordCount = Math.ceil(facetData.rows / 32);
+        
+        function decodeMembers(encoded) {
+            if (Array.isArray(encoded)) {
+                const list = new Int32Array(encoded.length);
+                let row = 0;
+                encoded.forEach((gap, i) => { row += gap; list[i] = row; });
+                return { list };
+            }
+            const bytes = atob(encoded);
+            const bits = new Uint32Array(wordCount);
+            for (let i = 0; i < bytes.length; i++) {
+                bits[i >> 2] |= bytes.charCodeAt(i) << ((i & 3) * 8);
+            }
+            return { bits };
+        }
+        
+        const facets = facetData.facets.map((facet, index) => ({
+            label: facet.label,
+            values: facet.values,
+            members: facet.rows.map(decodeMembers),
+            select: document.querySelector(`select[data-facet="${index}"]`)
+        }));
+        
+        // Bitset with a bit for every row
+        const allRows = new Uint32Array(wordCount).fill(0xFFFFFFFF);
+        if (facetData.rows % 32) {
+            allRows[wordCount - 1] = (1 << (facetData.rows % 32)) - 1;
+        }
+        
+        function popcount(x) {
+            x -= (x >>> 1) & 0x55555555;
+            x = (x & 0x33333333) + ((x >>> 2) & 0x33333333);
+            return Math.imul((x + (x >>> 4)) & 0x0F0F0F0F, 0x01010101) >>> 24;
+        }
+        
+        function countCommon(members, mask) {
+            let count = 0;
+            if (members.list) {
+                for (const row of members.list) count += (mask[row >> 5] >>> (row & 31)) & 1;
+            } else {
+                for (let i = 0; i < wordCount; i++) count += popcount(members.bits[i] & mask[i]);
+            }
+            return count;
+        }
+        
+        // Rows matching the search term, lowercased row text is read only once
+        let rowTexts = null;
+        let searchTerm = '';
+        let searchMask = allRows;
+        
+        function updateSearchMask(term) {
+            if (term === searchTerm) return;
+            searchTerm = term;
+            if (!term) {
+                searchMask = allRows;
+                return;
+            }
+            if (!rowTexts) rowTexts = Array.from(rows, row => row.textContent.toLowerCase());
+            searchMask = new Uint32Array(wordCount);
+            for (let i = 0; i < rowTexts.length; i++) {
+                if (rowTexts[i].includes(term)) searchMask[i >> 5] |= 1 << (i & 31);
+            }
+        }
+        
+        // Rows matching the search and every selected facet except `skip`
+        function matchingRows(skip) {
+            let mask = searchMask.slice();
+            facets.forEach((facet, index) => {
+                if (index === skip || !facet.select.value) return;
+                const members = facet.members[facet.select.value];
+                if (members.list) {
+                    const kept = new Uint32Array(wordCount);
+                    for (const row of members.list) kept[row >> 5] |= mask[row >> 5] & (1 << (row & 31));
+                    mask = kept;
+                } else {
+                    for (let i = 0; i < wordCount; i++) mask[i] &= members.bits[i];
+                }
+            });
+            return mask;
+        }
+        
+        // Apply all filters
+        function applyFilters() {
+            updateSearchMask(searchInput.value.toLowerCase());
+            
+            const visible = matchingRows(-1);
+            let visibleRowCount = 0;
+            for (let i = 0; i < rows.length; i++) {
+                const shown = (visible[i >> 5] >>> (i & 31)) & 1;
+                rows[i].classList.toggle('hidden', !shown);
+                visibleRowCount += shown;
+            }
+            
+            // Update option counts for the other selections
+            facets.forEach((facet, index) => {
+                const mask = matchingRows(index);
+                facet.members.forEach((members, value) => {
+                    const option = facet.select.options[value + 1];
+                    const text = `${facet.values[value]} (${countCommon(members, mask)})`;
+                    if (option.textContent !== text) option.textContent = text;
+                });
+            });
+            
+            // Update visible count
+            visibleCount.textContent = visibleRowCount;
+            
+            // Show/hide no results message
+            if (visibleRowCount === 0) {
+                tableContainer.style.display = 'none';
+                noResults.style.display = 'block';
+            } else {
+                tableContainer.style.display = 'block';
+                noResults.style.display = 'none';
+            }
+            
+            // Update filter info
+            updateFilterInfo();
+        }
+        
+        // Update filter information display
+        function updateFilterInfo() {
+            const filters = [];
+            facets.forEach(facet => {
+                if (facet.select.value) filters.push(`${facet.label}: ${facet.values[facet.select.value]}`);
+            });
+            if (searchTerm) filters.push(`Search: "${searchTerm}"`);
+            
+            if (filters.length > 0) {
+                filterInfo.textContent = '🔍 Active filters: ' + filters.join(' | ');
+                filterInfo.style.display = 'block';
+            } else {
+                filterInfo.style.display = 'none';
+            }
+        }
+        
+        // Clear all filters
+        function clearAllFilters() {
+            facets.forEach(facet => { facet.select.value = ''; });
+            searchInput.value = '';
+            applyFilters();
+        }
+        
+        // Event listeners
+        facets.forEach(facet => facet.select.addEventListener('change', applyFilters));
+        searchInput.addEventListener('input', applyFilters);
+        clearFiltersBtn.addEventListener('click', clearAllFilters);
+'''
+
+
+def _split_records(raw_csv):
+    """
+    Split raw CSV bytes into records without parsing their fields.
+    
+    A line break inside a quoted field leaves an odd number of quotes on the
+    line, so lines are joined until the quotes balance. Line ends are left
+    out of the records, and blank lines are skipped like the empty rows
+    csv.reader() returns for them.
+    """
+    records = []
+    pending = []
+    quotes = 0
+    for line in raw_csv.split(b'\n'):
+        pending.append(line)
+        quotes += line.count(b'"')
+        if quotes & 1:
+            continue
+        record = b'\n'.join(pending).rstrip(b'\r')
+        pending = []
+        quotes = 0
+        if record:
+            records.append(record)
+    return records
+
+
+def _row_key(record):
+    """
+    Content hash of a raw CSV record, used as its key in the build cache.
+    """
+    return hashlib.blake2b(record, digest_size=12).hexdigest()
+
+
+def _row_layout(production):
+    """
+    Indentation of <tr>, indentation of <td> and line ending used for rows.
+    """
+    if production:
+        return '', '', ''
+    return ' ' * 20, ' ' * 24, '\n'
+
+
+def _render_row(item, headers, production=False):
+    """
+    Render the cells of a table row that follow its "No." cell.
+    
+    The opening <tr> and the sequence number are added at build time, so a
+    cached row stays valid when other rows are added or removed before it.
+    """
+    row_indent, cell_indent, newline = _row_layout(production)
+    cells = [f'{cell_indent}<td><span class="detail-icon">⊙</span></td>{newline}']
+    
+    for header in headers:
+        value = item.get(header) or ''
+        css_class = ''
+        
+        # Apply specific styling based on column
+        if header.lower() in ['name', 'product name', 'název', 'nazev']:
+            css_class = 'product-name'
+        elif header.lower() in ['price', 'cena', 'cost']:
+            css_class = 'product-price'
+        elif header.lower() in ['link', 'url', 'alza link', 'odkaz']:
+            css_class = 'product-link'
+        
+        # Production builds drop empty class attributes
+        class_attr = f' class="{css_class}"' if css_class or not production else ''
+        
+        if value:
+            # Check if value is a URL and make it clickable
+            if value.startswith('http://') or value.startswith('https://'):
+                display_value = f'<a href="{html.escape(value)}" target="_blank">{html.escape(value)}</a>'
+                cells.append(f'{cell_indent}<td{class_attr}>{display_value}</td>{newline}')
+            else:
+                cells.append(f'{cell_indent}<td{class_attr}>{html.escape(value)}</td>{newline}')
+        else:
+            cells.append(f'{cell_indent}<td{class_attr}></td>{newline}')
+    
+    cells.append(f'{row_indent}</tr>{newline}')
+    return ''.join(cells)
+
+
+def _detect_facet_columns(columns, headers, max_values):
+    """
+    Pick the columns offered as dropdown filters.
+    
+    CPU and RAM columns (matched by name) are used if they have at most
+    max_values distinct values. Any other column qualifies if it has between
+    2 and max_values distinct values and at most one distinct value per two
+    rows. Columns holding links never qualify.
+    """
+    cpu_column = next((h for h in headers if 'cpu' in h.lower() or 'processor' in h.lower()), None)
+    ram_column = next((h for h in headers if 'ram' in h.lower() or 'memory' in h.lower() or 'paměť' in h.lower()), None)
+    named = list(dict.fromkeys(h for h in (cpu_column, ram_column) if h))
+    
+    detected = []
+    for header, values in columns.items():
+        distinct = set(values)
+        distinct.discard('')
+        limit = max_values if header in named else min(max_values, len(values) // 2)
+        if len(distinct) > limit:
+            if header in named:
+                print(f"Warning: No {header} filter added, it has more than {max_values} unique values")
+            continue
+        if any(value.startswith('http://') or value.startswith('https://') for value in distinct):
+            continue
+        if header in named or len(distinct) >= 2:
+            detected.append(header)
+    
+    return [h for h in named if h in detected] + [h for h in detected if h not in named]
+
+
+def _build_facets(columns, facet_columns):
+    """
+    Count the values of each facet column and record the rows holding them.
+    
+    Returns a list of dicts with the facet 'label', its sorted 'values' and
+    'rows': one ascending list of row indices per value. Columns without
+    values are left out.
+    """
+    facets = []
+    for column in facet_columns:
+        found = {}
+        for idx, value in enumerate(columns[column]):
+            if not value:
+                continue
+            rows = found.get(value)
+            if rows is None:
+                rows = found[value] = []
+            rows.append(idx)
+        
+        if not found:
+            continue
+        ordered = sorted(found)
+        facets.append({
+            'label': column,
+            'values': ordered,
+            'rows': [found[value] for value in ordered],
+        })
+    return facets
+
+
+def _encode_facet_rows(rows, row_count):
+    """
+    Encode the rows holding one facet value for the page script.
+    
+    Common values become a base64 bitset in which bit i % 8 of byte i // 8
+    is set for row i. Values in fewer than one row in DENSE_FACET_RATIO are
+    smaller as a list of gaps between their row indices.
+    """
+    if len(rows) * DENSE_FACET_RATIO < row_count:
+        return [row - previous for previous, row in zip([0] + rows, rows)]
+    
+    bits = bytearray((row_count + 7) // 8)
+    for row in rows:
+        bits[row >> 3] |= 1 << (row & 7)
+    return base64.b64encode(bits).decode('ascii')
+
+
+def _facet_json(facets, row_count):
+    """
+    Serialize facets for the page script, see _encode_facet_rows().
+    """
+    data = {
+        'rows': row_count,
+        'facets': [{
+            'label': facet['label'],
+            'values': facet['values'],
+            'rows': [_encode_facet_rows(rows, row_count) for rows in facet['rows']],
+        } for facet in facets],
+    }
+    # Keep values containing "</script>" from closing the data block
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+
+def _minify_css(css):
+    """
+    Strip comments and insignificant whitespace from a stylesheet.
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};:,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def _minify_script(script):
+    """
+    Strip indentation, blank lines and comment lines from a script.
+    
+    Line breaks are kept so automatic semicolon insertion still applies.
+    """
+    lines = (line.strip() for line in script.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+def _compressed_variants(path):
+    """
+    Paths of the precompressed variants _write_compressed() writes for path.
+    """
+    extensions = ['.gz'] if brotli is None else ['.gz', '.br']
+    return [Path(f'{path}{extension}') for extension in extensions]
+
+
+def _write_compressed(path, data):
+    """
+    Write precompressed .gz and .br variants next to path.
+    
+    Returns a dict mapping each written extension to its size in bytes.
+    The .br variant is skipped if the brotli package is not installed.
+    """
+    sizes = {}
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    Path(f'{path}.gz').write_bytes(compressed)
+    sizes['.gz'] = len(compressed)
+    
+    if brotli is not None:
+        # Quality 11 takes minutes on large exports, 9 is close in size
+        compressed = brotli.compress(data, quality=9)
+        Path(f'{path}.br').write_bytes(compressed)
+        sizes['.br'] = len(compressed)
+    return sizes
+
+
+def _write_asset(directory, extension, content):
+    """
+    Write a shared asset under a content-hashed name and return that name.
+    
+    Catalogues built with the same stylesheet or script refer to the same
+    file, so browsers only download it once and can cache it indefinitely.
+    """
+    data = content.encode('utf-8')
+    name = f'catalogue.{hashlib.sha1(data).hexdigest()[:10]}.{extension}'
+    path = Path(directory) / name
+    if not path.exists():
+        path.write_bytes(data)
+    if not all(variant.exists() for variant in _compressed_variants(path)):
+        _write_compressed(path, data)
+    return name
+
+
+def _format_size(num_bytes):
+    """
+    Human readable file size.
+    """
+    for unit in ['B', 'KB', 'MB']:
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}" if unit != 'B' else f"{num_bytes} B"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def _output_stamp(output_file):
+    """
+    Size and modification time of the generated file, used to detect edits.
+    """
+    try:
+        stat = os.stat(output_file)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_cache_meta(cache_file):
+    """
+    Read the first line of the build cache, or return None if it is unusable.
+    
+    The cache holds two JSON lines: a small header that is enough to detect a
+    no-op rebuild, and the per-row index that is only read when rows changed.
+    """
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            meta = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    
+    if not isinstance(meta, dict) or meta.get('version') != CACHE_VERSION:
+        return None
+    return meta
+
+
+def _load_cached_rows(cache_file, output_file):
+    """
+    Recover the rows of the previous build from its output file.
+    
+    Returns a dict mapping a row key to the UTF-8 encoded markup
+    _render_row() returned for it, or an empty dict if the cache cannot be used.
+    """
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            f.readline()
+            index = json.loads(f.readline())
+        # Row spans are byte offsets, the file is never decoded
+        with open(output_file, 'rb') as f:
+            previous = f.read()
+    except (OSError, ValueError):
+        return {}
+    
+    spans = index['spans']
+    rows = {}
+    for pos, key in enumerate(index['keys']):
+        if key not in rows:
+            rows[key] = previous[spans[2 * pos]:spans[2 * pos + 1]]
+    return rows
+
+
+def _save_cache(cache_file, meta, order, spans):
+    """
+    Write the build cache next to the generated catalogue.
+    """
+    index = {'keys': order, 'spans': spans}
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(meta, ensure_ascii=False, separators=(',', ':')) + '\n')
+        f.write(json.dumps(index, separators=(',', ':')) + '\n')
+
+
+def csv_to_catalogue(csv_file, output_file='catalogue.html', title='Alza Product Export List',
+                     incremental=True, cache_file=None, production=False, facets=None, max_facet_values=50):
+    """
+    Convert a CSV file into an interactive HTML catalogue with filtering and search.
+    
+    With incremental builds enabled, rendered rows are kept in a sidecar cache
+    (<output_file>.cache.json by default). The next build skips the work
+    entirely when the CSV has not changed. Otherwise every row is still
+    parsed for the filters, but only new or changed rows are rendered and
+    the rest are copied from the previous output as bytes. That roughly
+    halves a standard build; production builds also recompress the page.
+    
+    Production builds emit rows without whitespace, move the stylesheet and
+    script into shared content-hashed files next to the catalogue and write
+    precompressed .gz/.br variants of everything.
+    
+    Each facet column gets a dropdown filter. Row membership of every value
+    is embedded as a bitset (or a row list for rare values), so the page
+    combines any number of dropdowns and updates the "(count)" next to each
+    option without scanning rows. Columns with more than max_facet_values
+    distinct values get no dropdown.
+    
+    Args:
+        csv_file: Path to the CSV file
+        output_file: Output HTML file name (default: catalogue.html)
+        title: Title for the catalogue page
+        incremental: Reuse rows rendered by the previous build (default: True)
+        cache_file: Path to the build cache (default: <output_file>.cache.json)
+        production: Build minified output with external assets (default: False)
+        facets: Columns to filter by (default: CPU, RAM and low-cardinality columns)
+        max_facet_values: Most distinct values a facet may have (default: 50)
+    """
+    
+    if cache_file is None:
+        cache_file = str(output_file) + '.cache.json'
+    
+    # Read CSV data
+    with open(csv_file, 'rb') as f:
+        raw_csv = f.read()
+    
+    build_options = json.dumps([title, production, facets, max_facet_values]).encode('utf-8')
+    source_digest = hashlib.sha1(raw_csv + b'\0' + build_options).hexdigest()
+    meta = _load_cache_meta(cache_file) if incremental else None
+    
+    # Shared production assets are restored even when nothing else changed
+    if production:
+        asset_dir = Path(output_file).parent
+        css_name = _write_asset(asset_dir, 'css', _minify_css(CATALOGUE_CSS))
+        js_name = _write_asset(asset_dir, 'js', _minify_script(CATALOGUE_SCRIPT))
+    
+    # Nothing to do if neither the CSV, the title nor the output has changed
+    if (meta and meta.get('source_digest') == source_digest
+            and meta.get('output_stamp') == _output_stamp(output_file)
+            and (not production or all(variant.exists() for variant in _compressed_variants(output_file)))):
+        print(f"✓ Catalogue is up to date: {output_file}")
+        return
+    
+    reader = csv.reader(io.StringIO(raw_csv.decode('utf-8'), newline=''))
+    records = [record for record in reader if record]
+    if len(records) < 2:
+        print("Error: CSV file is empty or invalid")
+        return
+    headers = records[0]
+    
+    # Pad or cut every row to the header, like csv.DictReader would
+    items = records[1:]
+    for idx, item in enumerate(items):
+        if len(item) != len(headers):
+            items[idx] = (item + [''] * len(headers))[:len(headers)]
+    columns = dict(zip(headers, zip(*items)))
+    
+    # Find the columns to filter by and index their values
+    if facets is None:
+        facet_columns = _detect_facet_columns(columns, headers, max_facet_values)
+    else:
+        facet_columns = [column for column in facets if column in headers]
+        for column in facets:
+            if column not in headers:
+                print(f"Warning: Filter column '{column}' not found in CSV")
+    facet_list = _build_facets(columns, facet_columns)
+    
+    # Every value is a dropdown option the page recounts on each keystroke
+    for facet in [facet for facet in facet_list if len(facet['values']) > max_facet_values]:
+        print(f"Warning: No {facet['label']} filter added, it has more than {max_facet_values} unique values")
+        facet_list.remove(facet)
+    
+    # Cached rows are only reusable if they were rendered for the same columns
+    # and the previous output has not been touched since
+    cached_rows = {}
+    if (meta and meta.get('headers') == headers
+            and meta.get('production') == production
+            and meta.get('output_stamp') == _output_stamp(output_file)):
+        cached_rows = _load_cached_rows(cache_file, output_file)
+    
+    # Key rows by their raw bytes so unchanged rows need no further work.
+    # Quotes inside unquoted fields or bare \r line ends defeat the split,
+    # such files are keyed by their parsed fields instead.
+    raw_records = _split_records(raw_csv)
+    if len(raw_records) != len(records):
+        raw_records = ['\x1f'.join(record).encode('utf-8') for record in records]
+    order = [_row_key(record) for record in raw_records[1:]]
+    
+    # Render new or changed rows, reuse everything else
+    rows = {}
+    rendered = 0
+    for key, item in zip(order, items):
+        if key in rows:
+            continue
+        if key in cached_rows:
+            rows[key] = cached_rows[key]
+        else:
+            rows[key] = _render_row(dict(zip(headers, item)), headers, production).encode('utf-8')
+            rendered += 1
+    
+    # Inline the stylesheet and script, or link the shared production assets
+    if production:
+        style_block = f'    <link rel="stylesheet" href="{css_name}">\n'
+        script_block = f'    <script src="{js_name}"></script>\n'
+    else:
+        style_block = f'    <style>\n{CATALOGUE_CSS}    </style>\n'
+        script_block = f'    <script>\n{CATALOGUE_SCRIPT}    </script>\n'
+    
+    # Generate HTML
+    html_content = f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(title)}</title>
+{style_block}</head>
 <body>
     <div class="container">
         <div class="header">
@@ -321,28 +904,15 @@ def csv_to_catalogue(csv_file, output_file='catalogue.html', title='Alza Product
             <div class="controls">
 '''
     
-    # Add CPU filter if column exists
-    if cpu_column and cpu_values:
-        html_content += f'''                <div class="filter-group">
-                    <label class="filter-label">CPU</label>
-                    <select class="filter-select" id="cpuFilter">
-                        <option value="">All CPUs</option>
-'''
-        for value in cpu_values:
-            html_content += f'                        <option value="{html.escape(value)}">{html.escape(value)}</option>\n'
-        html_content += '''                    </select>
-                </div>
-'''
-    
-    # Add RAM filter if column exists
-    if ram_column and ram_values:
+    # Add a dropdown for each facet, option values index into its row sets
+    for facet_idx, facet in enumerate(facet_list):
         html_content += f'''                <div class="filter-group">
-                    <label class="filter-label">RAM</label>
-                    <select class="filter-select" id="ramFilter">
-                        <option value="">All RAM</option>
+                    <label class="filter-label">{html.escape(facet['label'])}</label>
+                    <select class="filter-select" data-facet="{facet_idx}">
+                        <option value="">All</option>
 '''
-        for value in ram_values:
-            html_content += f'                        <option value="{html.escape(value)}">{html.escape(value)}</option>\n'
+        for value_idx, (value, members) in enumerate(zip(facet['values'], facet['rows'])):
+            html_content += f'                        <option value="{value_idx}">{html.escape(value)} ({len(members)})</option>\n'
         html_content += '''                    </select>
                 </div>
 '''
@@ -374,42 +944,26 @@ def csv_to_catalogue(csv_file, output_file='catalogue.html', title='Alza Product
                 <tbody id="tableBody">
 '''
     
-    # Add each item as a table row
-    for idx, item in enumerate(items, 1):
-        # Add data attributes for filtering
-        cpu_val = item.get(cpu_column, '') if cpu_column else ''
-        ram_val = item.get(ram_column, '') if ram_column else ''
-        data_attrs = f'data-cpu="{html.escape(cpu_val)}" data-ram="{html.escape(ram_val)}"'
-        
-        html_content += f'                    <tr {data_attrs}>\n'
-        html_content += f'                        <td>{idx}</td>\n'
-        html_content += '                        <td><span class="detail-icon">⊙</span></td>\n'
-        
-        for header in headers:
-            value = item.get(header, '')
-            css_class = ''
-            
-            # Apply specific styling based on column
-            if header.lower() in ['name', 'product name', 'název', 'nazev']:
-                css_class = 'product-name'
-            elif header.lower() in ['price', 'cena', 'cost']:
-                css_class = 'product-price'
-            elif header.lower() in ['link', 'url', 'alza link', 'odkaz']:
-                css_class = 'product-link'
-            
-            if value:
-                # Check if value is a URL and make it clickable
-                if value.startswith('http://') or value.startswith('https://'):
-                    display_value = f'<a href="{html.escape(value)}" target="_blank">{html.escape(value)}</a>'
-                    html_content += f'                        <td class="{css_class}">{display_value}</td>\n'
-                else:
-                    html_content += f'                        <td class="{css_class}">{html.escape(value)}</td>\n'
-            else:
-                html_content += f'                        <td class="{css_class}"></td>\n'
-        
-        html_content += '                    </tr>\n'
+    # Add each item as a table row, remembering where each part starts so the
+    # next incremental build can splice it out of this file. Rows are kept
+    # as UTF-8 bytes, so reused rows are never decoded or encoded again.
+    row_indent, cell_indent, newline = _row_layout(production)
+    row_open = f'{row_indent}<tr>{newline}'.encode('utf-8')
+    head = html_content.encode('utf-8')
+    parts = [head]
+    spans = []
+    offset = len(head)
+    for idx, key in enumerate(order, 1):
+        row_cells = rows[key]
+        number_cell = f'{cell_indent}<td>{idx}</td>{newline}'.encode('utf-8')
+        cells_start = offset + len(row_open) + len(number_cell)
+        offset = cells_start + len(row_cells)
+        spans.extend((cells_start, offset))
+        parts.append(row_open)
+        parts.append(number_cell)
+        parts.append(row_cells)
     
-    html_content += '''                </tbody>
+    tail = '''                </tbody>
             </table>
         </div>
         
@@ -424,131 +978,152 @@ def csv_to_catalogue(csv_file, output_file='catalogue.html', title='Alza Product
         </div>
     </div>
 
-    <script>
-        const cpuFilter = document.getElementById('cpuFilter');
-        const ramFilter = document.getElementById('ramFilter');
-        const searchInput = document.getElementById('searchInput');
-        const clearFiltersBtn = document.getElementById('clearFilters');
-        const tableBody = document.getElementById('tableBody');
-        const tableContainer = document.querySelector('.table-container');
-        const noResults = document.getElementById('noResults');
-        const filterInfo = document.getElementById('filterInfo');
-        const visibleCount = document.getElementById('visibleCount');
-        
-        // Apply all filters
-        function applyFilters() {
-            const cpuValue = cpuFilter ? cpuFilter.value.toLowerCase() : '';
-            const ramValue = ramFilter ? ramFilter.value.toLowerCase() : '';
-            const searchTerm = searchInput.value.toLowerCase();
-            
-            const rows = tableBody.querySelectorAll('tr');
-            let visibleRowCount = 0;
-            
-            rows.forEach(row => {
-                const rowCpu = (row.dataset.cpu || '').toLowerCase();
-                const rowRam = (row.dataset.ram || '').toLowerCase();
-                const rowText = row.textContent.toLowerCase();
-                
-                const matchesCpu = !cpuValue || rowCpu === cpuValue;
-                const matchesRam = !ramValue || rowRam === ramValue;
-                const matchesSearch = !searchTerm || rowText.includes(searchTerm);
-                
-                if (matchesCpu && matchesRam && matchesSearch) {
-                    row.classList.remove('hidden');
-                    visibleRowCount++;
-                } else {
-                    row.classList.add('hidden');
-                }
-            });
-            
-            // Update visible count
-            visibleCount.textContent = visibleRowCount;
-            
-            // Show/hide no results message
-            if (visibleRowCount === 0) {
-                tableContainer.style.display = 'none';
-                noResults.style.display = 'block';
-            } else {
-                tableContainer.style.display = 'block';
-                noResults.style.display = 'none';
-            }
-            
-            // Update filter info
-            updateFilterInfo(cpuValue, ramValue, searchTerm);
-        }
-        
-        // Update filter information display
-        function updateFilterInfo(cpu, ram, search) {
-            const filters = [];
-            if (cpu) filters.push(`CPU: ${cpu}`);
-            if (ram) filters.push(`RAM: ${ram}`);
-            if (search) filters.push(`Search: "${search}"`);
-            
-            if (filters.length > 0) {
-                filterInfo.textContent = '🔍 Active filters: ' + filters.join(' | ');
-                filterInfo.style.display = 'block';
-            } else {
-                filterInfo.style.display = 'none';
-            }
-        }
-        
-        // Clear all filters
-        function clearAllFilters() {
-            if (cpuFilter) cpuFilter.value = '';
-            if (ramFilter) ramFilter.value = '';
-            searchInput.value = '';
-            applyFilters();
-        }
-        
-        // Event listeners
-        if (cpuFilter) cpuFilter.addEventListener('change', applyFilters);
-        if (ramFilter) ramFilter.addEventListener('change', applyFilters);
-        searchInput.addEventListener('input', applyFilters);
-        clearFiltersBtn.addEventListener('click', clearAllFilters);
-    </script>
-</body>
+    <script type="application/json" id="facetData">''' + _facet_json(facet_list, len(items)) + '''</script>
+''' + script_block + '''</body>
 </html>'''
+    parts.append(tail.encode('utf-8'))
+    data = b''.join(parts)
     
     # Write to file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    with open(output_file, 'wb') as f:
+        f.write(data)
+    if production:
+        compressed_sizes = _write_compressed(output_file, data)
+    else:
+        # A server preferring precompressed files would keep serving a stale
+        # production page, so drop any left by an earlier production build
+        for extension in ('.gz', '.br'):
+            Path(f'{output_file}{extension}').unlink(missing_ok=True)
+    
+    # Remember the rendered rows for the next build
+    if incremental:
+        meta = {
+            'version': CACHE_VERSION,
+            'source_digest': source_digest,
+            'output_stamp': _output_stamp(output_file),
+            'headers': headers,
+            'production': production,
+        }
+        _save_cache(cache_file, meta, order, spans)
     
     print(f"✓ Catalogue created successfully: {output_file}")
     print(f"✓ Total items: {len(items)}")
+    print(f"✓ Rows rendered: {rendered} (reused from cache: {len(rows) - rendered})")
     print(f"✓ Fields: {', '.join(headers)}")
-    if cpu_column:
-        print(f"✓ CPU filter added: {len(cpu_values)} unique values")
-    if ram_column:
-        print(f"✓ RAM filter added: {len(ram_values)} unique values")
+    for facet in facet_list:
+        print(f"✓ {facet['label']} filter added: {len(facet['values'])} unique values")
+    if production:
+        _report_production_build(data, compressed_sizes, dict(zip(headers, items[0])), len(items), headers,
+                                 html_content, style_block, script_block)
 
 
-# Example usage
-if __name__ == "__main__":
+def _report_production_build(data, compressed_sizes, sample, row_count, headers, head, style_block, script_block):
+    """
+    Print the size of a production build against the standard output.
+    
+    The standard output differs only in row whitespace and inlined assets,
+    so its size is derived from one sample row instead of a second build.
+    No render time is measured. As a proxy for time to first render, the
+    report gives the bytes a browser must receive before it can paint the
+    first row. The external stylesheet blocks rendering, so on a first visit
+    it adds its size and one request; later visits load it from the cache.
+    """
+    row_indent, cell_indent, newline = _row_layout(False)
+    row_overhead = (len(_render_row(sample, headers)) - len(_render_row(sample, headers, production=True))
+                    + len(row_indent) + len(cell_indent) + 2 * len(newline))
+    
+    standard_style = f'    <style>\n{CATALOGUE_CSS}    </style>\n'
+    standard_script = f'    <script>\n{CATALOGUE_SCRIPT}    </script>\n'
+    asset_overhead = (len(standard_style.encode('utf-8')) - len(style_block.encode('utf-8'))
+                      + len(standard_script.encode('utf-8')) - len(script_block.encode('utf-8')))
+    standard_size = len(data) + row_count * row_overhead + asset_overhead
+    
+    production_head = len(head.encode('utf-8'))
+    standard_head = production_head + len(standard_style.encode('utf-8')) - len(style_block.encode('utf-8'))
+    first_visit_head = production_head + len(_minify_css(CATALOGUE_CSS).encode('utf-8'))
+    reduction = 100 * (1 - len(data) / standard_size)
+    
+    print(f"✓ Production size: {_format_size(len(data))} (standard {_format_size(standard_size)}, -{reduction:.1f}%)")
+    for extension, size in compressed_sizes.items():
+        print(f"✓ Precompressed {extension}: {_format_size(size)}")
+    print("✓ First render proxy, bytes before the first row can be painted (not a measured time):")
+    print(f"  standard {_format_size(standard_head)} in 1 request")
+    print(f"  production first visit {_format_size(first_visit_head)} in 2 requests (page + stylesheet)")
+    print(f"  production cached stylesheet {_format_size(production_head)} in 1 request")
+
+
+def _prompt_arguments(args):
+    """
+    Ask for the conversion settings interactively.
+    """
+    # Get CSV file name from user
+    args.csv_file = input("Enter the CSV file name (e.g., products.csv): ").strip()
+    
+    # Get optional custom output name
+    output_file = input("Enter output HTML file name (press Enter for 'catalogue.html'): ").strip()
+    if output_file:
+        args.output = output_file
+    
+    # Get optional custom title
+    catalogue_title = input("Enter catalogue title (press Enter for 'Alza Product Export List'): ").strip()
+    if catalogue_title:
+        args.title = catalogue_title
+    
+    # Get optional filter columns
+    facet_input = input("Enter filter columns separated by commas (press Enter to detect automatically): ").strip()
+    if facet_input:
+        args.facets = facet_input
+    
+    # Production builds are minified and precompressed
+    production = input("Build for production (minified, external assets, precompressed)? (y/n): ").strip().lower()
+    args.production = production == 'y'
+
+
+def main(argv=None):
+    """
+    Convert a CSV file from the command line, or interactively without arguments.
+    """
+    parser = argparse.ArgumentParser(description="Convert a CSV file into an interactive HTML catalogue.")
+    parser.add_argument('csv_file', nargs='?', help="CSV file to convert (prompts for settings if omitted)")
+    parser.add_argument('-o', '--output', default='catalogue.html', help="output HTML file (default: catalogue.html)")
+    parser.add_argument('-t', '--title', default='Alza Product Export List', help="catalogue title")
+    parser.add_argument('--facets', help="comma separated filter columns (default: detect automatically)")
+    parser.add_argument('--max-facet-values', type=int, default=50, metavar='N',
+                        help="skip filter columns with more than N unique values (default: 50)")
+    parser.add_argument('--production', action='store_true',
+                        help="minified output with external assets and precompressed variants")
+    parser.add_argument('--no-incremental', action='store_true', help="ignore the build cache and render every row")
+    parser.add_argument('--profile', nargs='?', const='catalogue_profile', metavar='NAME',
+                        help="profile the build, writing cProfile stats to NAME.prof (default: catalogue_profile)")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="track allocations instead of CPU time, writing NAME.alloc.txt")
+    parser.add_argument('--profile-top', type=int, default=25, metavar='N',
+                        help="functions or allocation sites to report when profiling (default: 25)")
+    args = parser.parse_args(argv)
+    if args.profile_memory and not args.profile:
+        args.profile = 'catalogue_profile'
+    
     print("=" * 60)
     print("CSV to HTML Catalogue Converter")
     print("=" * 60)
     print()
     
-    # Get CSV file name from user
-    csv_file = input("Enter the CSV file name (e.g., products.csv): ").strip()
+    if args.csv_file is None:
+        _prompt_arguments(args)
     
     # Check if file exists
-    if not Path(csv_file).exists():
-        print(f"\n❌ Error: File '{csv_file}' not found!")
+    if not Path(args.csv_file).exists():
+        print(f"\n❌ Error: File '{args.csv_file}' not found!")
         print("Make sure the file exists in the current directory.")
-        exit(1)
+        return 1
     
-    # Get optional custom output name
-    output_file = input("Enter output HTML file name (press Enter for 'catalogue.html'): ").strip()
-    if not output_file:
-        output_file = 'catalogue.html'
-    elif not output_file.endswith('.html'):
+    output_file = args.output
+    if not output_file.endswith('.html'):
         output_file += '.html'
     
-    # Get optional custom title
-    catalogue_title = input("Enter catalogue title (press Enter for 'Alza Product Export List'): ").strip()
-    if not catalogue_title:
-        catalogue_title = 'Alza Product Export List'
+    facet_columns = None
+    if args.facets:
+        facet_columns = [column.strip() for column in args.facets.split(',') if column.strip()]
     
     print("\n" + "-" * 60)
     print("Converting...")
@@ -556,10 +1131,18 @@ if __name__ == "__main__":
     
     # Convert the CSV to HTML catalogue
     try:
-        csv_to_catalogue(csv_file, output_file, catalogue_title)
+        with profile_run(args.profile, args.profile_top, args.profile_memory) if args.profile else nullcontext():
+            csv_to_catalogue(args.csv_file, output_file, args.title, incremental=not args.no_incremental,
+                             production=args.production, facets=facet_columns,
+                             max_facet_values=args.max_facet_values)
         print("\n" + "=" * 60)
         print(f"✓ Success! Open '{output_file}' in your browser to view!")
         print("=" * 60)
     except Exception as e:
         print(f"\n❌ Error: {e}")
-        exit(1)
\ No newline at end of file
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
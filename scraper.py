@@ -4,12 +4,72 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from contextlib import nullcontext
+import argparse
 import time
 import csv
+import re
+import sys
 
-def scrape_alza(search_query):
+from csv_to_catalogue import csv_to_catalogue
+from profiling import profile_run
+
+# Processor and memory patterns in the product description
+CPU_PATTERN = re.compile(r'([^,]*(?:Intel|AMD|Apple M\d+|Ryzen|Core i\d|Celeron|Pentium)[^,]*)')
+RAM_PATTERN = re.compile(r'RAM\s+(\d+\s*GB)', re.IGNORECASE)
+
+def extract_product(product):
     """
-    Scrape product data from alza.cz based on search query
+    Extract name, price, CPU, RAM, description and URL from a product tile
+    """
+    # Extract product name
+    name_elem = product.find_element(By.CSS_SELECTOR, "a.name")
+    name = name_elem.text.strip()
+    
+    # Extract price
+    try:
+        price_elem = product.find_element(By.CSS_SELECTOR, "span.price-box__primary-price__value")
+        price = price_elem.text.strip()
+    except:
+        price = "Price not available"
+    
+    # Extract product URL
+    url = name_elem.get_attribute("href")
+    
+    # Extract description (CPU, RAM, etc.)
+    try:
+        description_elem = product.find_element(By.CSS_SELECTOR, "div.Description")
+        description = description_elem.text.strip()
+    except:
+        description = "No description available"
+    
+    # Parse CPU and RAM from description
+    cpu = "N/A"
+    ram = "N/A"
+    
+    if description != "No description available":
+        # Extract CPU (look for processor info)
+        cpu_match = CPU_PATTERN.search(description)
+        if cpu_match:
+            cpu = cpu_match.group(1).strip()
+        
+        # Extract RAM
+        ram_match = RAM_PATTERN.search(description)
+        if ram_match:
+            ram = ram_match.group(1).strip()
+    
+    return {
+        "name": name,
+        "price": price,
+        "cpu": cpu,
+        "ram": ram,
+        "description": description,
+        "url": url
+    }
+
+def open_session():
+    """
+    Start Edge, open alza.cz and accept the cookie consent popup
     """
     # Path to your Edge WebDriver (assumes it's in the same folder as script)
     driver_path = "./msedgedriver.exe"  # Change to "msedgedriver" on Linux/Mac
@@ -18,22 +78,40 @@ def scrape_alza(search_query):
     service = Service(driver_path)
     driver = webdriver.Edge(service=service)
     
+    print(f"Opening alza.cz...")
+    driver.get("https://www.alza.cz")
+    driver.maximize_window()
+    
+    # Handle cookie consent popup
     try:
-        print(f"Opening alza.cz...")
-        driver.get("https://www.alza.cz")
-        driver.maximize_window()
-        
-        # Handle cookie consent popup
-        try:
-            print("Checking for cookie consent popup...")
-            cookie_button = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "a.js-cookies-info-accept"))
-            )
-            cookie_button.click()
-            print("Cookie consent accepted.")
-            time.sleep(1)
-        except Exception as e:
-            print("No cookie popup found or already accepted.")
+        print("Checking for cookie consent popup...")
+        cookie_button = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "a.js-cookies-info-accept"))
+        )
+        cookie_button.click()
+        print("Cookie consent accepted.")
+        time.sleep(1)
+    except Exception as e:
+        print("No cookie popup found or already accepted.")
+    
+    return driver
+
+def scrape_alza(search_query, driver=None, known=None):
+    """
+    Scrape product data from alza.cz based on search query
+    
+    Pass a driver from open_session() to reuse a warm browser session; it is
+    left open afterwards. Pass known (product URL -> product data from a
+    previous run) to stop as soon as a page has only known, unchanged
+    products; the known products past that point are carried over.
+    """
+    own_driver = driver is None
+    
+    try:
+        if own_driver:
+            driver = open_session()
+        else:
+            driver.get("https://www.alza.cz")
         
         # Wait for the search input to be present
         wait = WebDriverWait(driver, 10)
@@ -50,6 +128,7 @@ def scrape_alza(search_query):
         time.sleep(3)
         
         scraped_data = []
+        seen_urls = set()
         page_number = 1
         
         while True:
@@ -63,67 +142,41 @@ def scrape_alza(search_query):
             print(f"Found {len(products)} products on page {page_number}")
             print("-" * 80)
             
+            page_products = 0
+            page_unchanged = True
             for idx, product in enumerate(products, 1):  # Scrape all products on the page
                 try:
-                    # Extract product name
-                    name_elem = product.find_element(By.CSS_SELECTOR, "a.name")
-                    name = name_elem.text.strip()
+                    product_data = extract_product(product)
                     
-                    # Extract price
-                    try:
-                        price_elem = product.find_element(By.CSS_SELECTOR, "span.price-box__primary-price__value")
-                        price = price_elem.text.strip()
-                    except:
-                        price = "Price not available"
+                    # Products from earlier pages stay in the list after "more"
+                    if product_data['url'] in seen_urls:
+                        continue
+                    seen_urls.add(product_data['url'])
+                    page_products += 1
                     
-                    # Extract product URL
-                    url = name_elem.get_attribute("href")
-                    
-                    # Extract description (CPU, RAM, etc.)
-                    try:
-                        description_elem = product.find_element(By.CSS_SELECTOR, "div.Description")
-                        description = description_elem.text.strip()
-                    except:
-                        description = "No description available"
-                    
-                    # Parse CPU and RAM from description
-                    cpu = "N/A"
-                    ram = "N/A"
-                    
-                    if description != "No description available":
-                        # Extract CPU (look for processor info)
-                        import re
-                        cpu_match = re.search(r'([^,]*(?:Intel|AMD|Apple M\d+|Ryzen|Core i\d|Celeron|Pentium)[^,]*)', description)
-                        if cpu_match:
-                            cpu = cpu_match.group(1).strip()
-                        
-                        # Extract RAM
-                        ram_match = re.search(r'RAM\s+(\d+\s*GB)', description, re.IGNORECASE)
-                        if ram_match:
-                            ram = ram_match.group(1).strip()
+                    if known is None or known.get(product_data['url']) != product_data:
+                        page_unchanged = False
                     
                     # Store data
-                    product_data = {
-                        "name": name,
-                        "price": price,
-                        "cpu": cpu,
-                        "ram": ram,
-                        "description": description,
-                        "url": url
-                    }
                     scraped_data.append(product_data)
                     
                     # Print product info
-                    print(f"\n{name}")
-                    print(f"Price: {price}")
-                    print(f"CPU: {cpu}")
-                    print(f"RAM: {ram}")
-                    print(f"URL: {url}")
+                    print(f"\n{product_data['name']}")
+                    print(f"Price: {product_data['price']}")
+                    print(f"CPU: {product_data['cpu']}")
+                    print(f"RAM: {product_data['ram']}")
+                    print(f"URL: {product_data['url']}")
                     
                 except Exception as e:
                     print(f"Error extracting product: {e}")
                     continue
             
+            # Later pages are assumed unchanged once a whole page is
+            if known and page_products and page_unchanged:
+                print(f"\nPage {page_number} has only known, unchanged products. Stopping early.")
+                scraped_data.extend(product for url, product in known.items() if url not in seen_urls)
+                break
+            
             # Check if "more" button exists
             try:
                 more_button = driver.find_element(By.CSS_SELECTOR, "a.js-button-more.button-more")
@@ -148,7 +201,8 @@ def scrape_alza(search_query):
         print(f"Scraping completed! Total products scraped: {len(scraped_data)}")
         
         # Keep browser open for 5 seconds to see results
-        time.sleep(5)
+        if own_driver:
+            time.sleep(5)
         
         return scraped_data
         
@@ -157,38 +211,96 @@ def scrape_alza(search_query):
         return []
         
     finally:
-        driver.quit()
-        print("Browser closed.")
+        if own_driver and driver is not None:
+            driver.quit()
+            print("Browser closed.")
 
-def main():
+def save_results_csv(results, filename):
+    """
+    Save scraped products to a CSV file
+    """
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Name', 'Price', 'CPU', 'RAM', 'Description', 'URL'])  # Header
+        for product in results:
+            writer.writerow([product['name'], product['price'], product['cpu'], product['ram'], product['description'], product['url']])
+    print(f"Results saved to {filename}")
+
+def load_results_csv(filename):
+    """
+    Load products saved by save_results_csv(), keyed by product URL
+    """
+    with open(filename, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        return {
+            row['URL']: {
+                "name": row['Name'],
+                "price": row['Price'],
+                "cpu": row['CPU'],
+                "ram": row['RAM'],
+                "description": row['Description'],
+                "url": row['URL']
+            }
+            for row in reader
+        }
+
+def main(argv=None):
     """
     Main function to run the scraper
+    
+    Runs interactively without arguments, or non-interactively with --query.
     """
+    parser = argparse.ArgumentParser(description="Scrape product data from alza.cz.")
+    parser.add_argument('-q', '--query', help="search query (prompts interactively if omitted)")
+    parser.add_argument('-o', '--output', help="CSV file to save results to (default: alza_results_<query>.csv)")
+    parser.add_argument('-c', '--catalogue', metavar='HTML', help="also build an HTML catalogue from the results")
+    parser.add_argument('-t', '--title', default='Alza Product Export List', help="catalogue title")
+    parser.add_argument('--profile', nargs='?', const='scraper_profile', metavar='NAME',
+                        help="profile the run, writing cProfile stats to NAME.prof (default: scraper_profile)")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="track allocations instead of CPU time, writing NAME.alloc.txt")
+    parser.add_argument('--profile-top', type=int, default=25, metavar='N',
+                        help="functions or allocation sites to report when profiling (default: 25)")
+    args = parser.parse_args(argv)
+    if args.profile_memory and not args.profile:
+        args.profile = 'scraper_profile'
+    
     print("=" * 80)
     print("ALZA.CZ WEB SCRAPER")
     print("=" * 80)
     
-    # Get search query from user
-    search_query = input("\nEnter what you want to search on alza.cz: ").strip()
+    interactive = args.query is None
+    if interactive:
+        # Get search query from user
+        search_query = input("\nEnter what you want to search on alza.cz: ").strip()
+    else:
+        search_query = args.query.strip()
     
     if not search_query:
         print("Search query cannot be empty!")
-        return
+        return 1
     
     # Run scraper
-    results = scrape_alza(search_query)
+    with profile_run(args.profile, args.profile_top, args.profile_memory) if args.profile else nullcontext():
+        results = scrape_alza(search_query)
+    
+    if not results:
+        print("No products were scraped.")
+        return 1
     
     # Optional: Save results to CSV file
-    if results:
+    if interactive:
         save_option = input("\nDo you want to save results to a CSV file? (y/n): ").strip().lower()
-        if save_option == 'y':
-            filename = f"alza_results_{search_query.replace(' ', '_')}.csv"
-            with open(filename, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Name', 'Price', 'CPU', 'RAM', 'Description', 'URL'])  # Header
-                for product in results:
-                    writer.writerow([product['name'], product['price'], product['cpu'], product['ram'], product['description'], product['url']])
-            print(f"Results saved to {filename}")
+    else:
+        save_option = 'y'
+    
+    if save_option == 'y':
+        filename = args.output or f"alza_results_{search_query.replace(' ', '_')}.csv"
+        save_results_csv(results, filename)
+        
+        if args.catalogue:
+            csv_to_catalogue(filename, args.catalogue, args.title)
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
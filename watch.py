@@ -0,0 +1,291 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import argparse
+import json
+import sys
+import threading
+import time
+
+from csv_to_catalogue import csv_to_catalogue
+from scraper import load_results_csv, open_session, save_results_csv, scrape_alza
+
+# Refresh interval for registry entries that do not set one (6 hours)
+DEFAULT_INTERVAL = 6 * 60 * 60
+
+# Weight of the latest run in the smoothed change rate
+CHANGE_RATE_WEIGHT = 0.5
+
+# Crawl every page at least once per this many refresh intervals (default)
+FULL_CRAWL_EVERY = 4
+
+# Run history kept in the state file
+STATE_KEYS = ('last_run', 'last_full_crawl', 'last_latency', 'change_rate', 'last_error')
+
+def load_registry(registry_file):
+    """
+    Load the query registry
+
+    The registry is a JSON list. Each entry is either a search query or an
+    object with "query" and optional "interval" (seconds between refreshes),
+    "full_crawl_every" (crawl all pages at least once per this many
+    intervals), "output" (CSV file), "catalogue" (HTML file, null to skip)
+    and "title".
+    """
+    with open(registry_file, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+
+    entries = []
+    for entry in registry:
+        if isinstance(entry, str):
+            entry = {"query": entry}
+        slug = entry['query'].replace(' ', '_')
+        entries.append({
+            "query": entry['query'],
+            "interval": entry.get('interval', DEFAULT_INTERVAL),
+            "full_crawl_every": entry.get('full_crawl_every', FULL_CRAWL_EVERY),
+            "output": entry.get('output', f"alza_results_{slug}.csv"),
+            "catalogue": entry.get('catalogue', f"alza_results_{slug}.html"),
+            "title": entry.get('title', f"Alza: {entry['query']}"),
+            "last_run": 0,
+            "last_full_crawl": 0,
+            "last_latency": None,
+            "change_rate": 1.0,
+            "last_error": None,
+        })
+    return entries
+
+def load_state(state_file, entries):
+    """
+    Restore run history from a previous watch session
+    """
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return
+
+    for entry in entries:
+        previous = state.get(entry['query'], {})
+        for key in STATE_KEYS:
+            if key in previous:
+                entry[key] = previous[key]
+
+def save_state(state_file, entries):
+    """
+    Save run history so a restarted watch knows which queries are stale
+    """
+    state = {
+        entry['query']: {key: entry[key] for key in STATE_KEYS}
+        for entry in entries
+    }
+    with open(state_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+def staleness(entry, now):
+    """
+    Time since the last run in units of the entry's refresh interval
+    """
+    return (now - entry['last_run']) / entry['interval']
+
+def due_entries(entries, now):
+    """
+    Entries due for a refresh, most urgent first
+
+    Urgency is staleness weighted by how much the results changed recently,
+    so volatile queries are refreshed before quiet ones that are equally overdue.
+    """
+    due = [entry for entry in entries if staleness(entry, now) >= 1]
+    return sorted(due, key=lambda entry: staleness(entry, now) * (1 + entry['change_rate']), reverse=True)
+
+def refresh(entry, driver):
+    """
+    Re-scrape one query and write its CSV and catalogue
+
+    The crawl may stop early at a page of known, unchanged products, which
+    carries the products past it over unchecked. To pick up price changes
+    and delisted products further down, every page is crawled once the last
+    full crawl is older than full_crawl_every intervals.
+
+    Returns False if the scrape failed.
+    """
+    known = {}
+    if Path(entry['output']).exists():
+        known = load_results_csv(entry['output'])
+
+    full_crawl = time.time() - entry['last_full_crawl'] >= entry['full_crawl_every'] * entry['interval']
+    if full_crawl:
+        print(f"Crawling all pages of '{entry['query']}'")
+
+    results = scrape_alza(entry['query'], driver=driver, known=None if full_crawl else known)
+    if not results:
+        entry['last_error'] = "No products scraped"
+        return False
+
+    # Products carried over from the previous CSV are the very same objects,
+    # the change rate only counts what was actually crawled
+    crawled = {product['url']: product for product in results if product is not known.get(product['url'])}
+    changed = sum(1 for url, product in crawled.items() if known.get(url) != product)
+    total = len(crawled)
+    if full_crawl:
+        # Gone products can only be told apart from skipped ones after a full crawl
+        changed += sum(1 for url in known if url not in crawled)
+        total = max(total, len(known))
+        entry['last_full_crawl'] = time.time()
+    change = changed / max(total, 1)
+    entry['change_rate'] = CHANGE_RATE_WEIGHT * change + (1 - CHANGE_RATE_WEIGHT) * entry['change_rate']
+    entry['last_error'] = None
+    print(f"{changed} products new, changed or gone for '{entry['query']}' ({len(crawled)} crawled)")
+
+    save_results_csv(results, entry['output'])
+    if entry['catalogue']:
+        csv_to_catalogue(entry['output'], entry['catalogue'], entry['title'])
+    return True
+
+def status_report(entries, running, lock):
+    """
+    Status served by the watch endpoint
+    """
+    now = time.time()
+    with lock:
+        waiting = [entry for entry in due_entries(entries, now) if entry['query'] != running.get('query')]
+        return {
+            "queue_depth": len(waiting),
+            "running": running.get('query'),
+            "queries": [
+                {
+                    "query": entry['query'],
+                    "interval": entry['interval'],
+                    "last_run": entry['last_run'] or None,
+                    "last_full_crawl": entry['last_full_crawl'] or None,
+                    "last_latency": entry['last_latency'],
+                    "change_rate": round(entry['change_rate'], 3),
+                    "next_run": entry['last_run'] + entry['interval'],
+                    "last_error": entry['last_error'],
+                }
+                for entry in entries
+            ],
+        }
+
+def start_status_server(host, port, entries, running, lock):
+    """
+    Serve the watch status as JSON on http://host:port/status
+    """
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') not in ('', '/status'):
+                self.send_error(404)
+                return
+            body = json.dumps(status_report(entries, running, lock), ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep the scraper output readable
+            pass
+
+    server = ThreadingHTTPServer((host, port), StatusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Status endpoint: http://{host}:{port}/status")
+    return server
+
+def close_session(driver):
+    """
+    Quit a browser session, ignoring errors from one that already died
+    """
+    if driver is None:
+        return
+    try:
+        driver.quit()
+        print("Browser closed.")
+    except Exception as e:
+        print(f"Error closing browser: {e}")
+
+def watch(registry_file, host='127.0.0.1', port=8765, poll_interval=30):
+    """
+    Keep the queries in the registry fresh until interrupted
+
+    The most urgent due query is refreshed first, using one browser session
+    for all of them. Run history is kept in <registry_file>.state.json.
+    """
+    entries = load_registry(registry_file)
+    if not entries:
+        print(f"No queries to watch in {registry_file}.")
+        return
+    state_file = f"{registry_file}.state.json"
+    load_state(state_file, entries)
+
+    lock = threading.Lock()
+    running = {}
+    server = start_status_server(host, port, entries, running, lock)
+    driver = None
+
+    print(f"Watching {len(entries)} queries from {registry_file}. Press Ctrl+C to stop.")
+    try:
+        while True:
+            now = time.time()
+            with lock:
+                due = due_entries(entries, now)
+
+            if not due:
+                next_run = min(entry['last_run'] + entry['interval'] for entry in entries)
+                time.sleep(max(1, min(poll_interval, next_run - now)))
+                continue
+
+            entry = due[0]
+            print("\n" + "=" * 80)
+            print(f"Refreshing '{entry['query']}' ({len(due) - 1} more queries due)")
+            print("=" * 80)
+
+            running['query'] = entry['query']
+            start = time.monotonic()
+            try:
+                # Start a browser on demand and keep it warm between queries
+                if driver is None:
+                    driver = open_session()
+                ok = refresh(entry, driver)
+            except Exception as e:
+                # One broken query must not stop the others
+                entry['last_error'] = f"{type(e).__name__}: {e}"
+                print(f"Error refreshing '{entry['query']}': {entry['last_error']}")
+                ok = False
+
+            with lock:
+                entry['last_run'] = time.time()
+                entry['last_latency'] = round(time.monotonic() - start, 1)
+                running.pop('query', None)
+            save_state(state_file, entries)
+
+            # A failed scrape may have left the browser in a bad state
+            if not ok:
+                close_session(driver)
+                driver = None
+
+    except KeyboardInterrupt:
+        print("\nStopping watch mode.")
+
+    finally:
+        close_session(driver)
+        server.shutdown()
+
+def main(argv=None):
+    """
+    Run watch mode from the command line
+    """
+    parser = argparse.ArgumentParser(description="Keep alza.cz search results fresh on a schedule.")
+    parser.add_argument('registry', help="JSON file with the queries to watch")
+    parser.add_argument('--host', default='127.0.0.1', help="status endpoint host (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="status endpoint port (default: 8765)")
+    args = parser.parse_args(argv)
+
+    if not Path(args.registry).exists():
+        print(f"Error: Registry '{args.registry}' not found!")
+        return 1
+
+    watch(args.registry, args.host, args.port)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())